@@ -6,6 +6,7 @@ import plotly.graph_objects as go
 import os
 import ui
 import logic
+import network
 import intelligence as intel
 
 # ==============================================================================
@@ -26,6 +27,11 @@ def get_key(key_name):
             return None
     return value
 
+def rerun_page():
+    # Only the page fragment when its own widget triggered this run; a full rerun when the page ran as part of the script
+    try: st.rerun(scope="fragment")
+    except Exception: st.rerun()
+
 # CONSTANTS
 START_YEAR = 2021 
 
@@ -101,57 +107,13 @@ with st.sidebar:
 # ==============================================================================
 # 4. DATA PIPELINE (DEPENDS ON SELECTED_WEEK)
 # ==============================================================================
-if 'box_scores' not in st.session_state or st.session_state.get('week') != selected_week:
-    with ui.luxury_spinner(f"Accessing Week {selected_week} Data..."):
-        st.session_state['box_scores'] = league.box_scores(week=selected_week)
-        st.session_state['week'] = selected_week
-    st.rerun()
-
-box_scores = st.session_state['box_scores']
-
-# --- DATA COLLECTION LOOP ---
-matchup_data = []
-efficiency_data = []
-all_active_players = [] 
-bench_highlights = []
-
-for game in box_scores:
-    home, away = game.home_team, game.away_team
-    
-    def get_roster_data(lineup, team_name):
-        starters, bench = [], []
-        for p in lineup:
-            info = {"Name": p.name, "Score": p.points, "Pos": p.slot_position}
-            status = getattr(p, 'injuryStatus', 'ACTIVE')
-            is_injured = any(k in str(status).upper() for k in ['OUT', 'IR', 'RESERVE', 'SUSPENDED'])
-            if p.slot_position == 'BE':
-                bench.append(info)
-                if p.points > 15: 
-                    bench_highlights.append({"Team": team_name, "Player": p.name, "Score": p.points})
-            else:
-                starters.append(info)
-                if not is_injured: 
-                    all_active_players.append({
-                        "Name": p.name, "Points": p.points, "Team": team_name, "ID": p.playerId
-                    })
-        return starters, bench
-
-    h_r, h_br = get_roster_data(game.home_lineup, home.team_name)
-    a_r, a_br = get_roster_data(game.away_lineup, away.team_name)
-    matchup_data.append({"Home": home.team_name, "Home Score": game.home_score, "Home Logo": ui.get_logo(home), "Home Roster": h_r, "Away": away.team_name, "Away Score": game.away_score, "Away Logo": ui.get_logo(away), "Away Roster": a_r})
-    h_p = sum(p['Score'] for p in h_r) + sum(p['Score'] for p in h_br)
-    a_p = sum(p['Score'] for p in a_r) + sum(p['Score'] for p in a_br)
-    efficiency_data.append({"Team": home.team_name, "Total Potential": h_p, "Starters": sum(p['Score'] for p in h_r), "Bench": sum(p['Score'] for p in h_br)})
-    efficiency_data.append({"Team": away.team_name, "Total Potential": a_p, "Starters": sum(p['Score'] for p in a_r), "Bench": sum(p['Score'] for p in a_br)})
-
-if efficiency_data: df_eff = pd.DataFrame(efficiency_data).sort_values(by="Total Potential", ascending=False)
-else: df_eff = pd.DataFrame(columns=["Team", "Total Potential", "Starters", "Bench"])
-
-if all_active_players: df_players = pd.DataFrame(all_active_players).sort_values(by="Points", ascending=False).head(5)
-else: df_players = pd.DataFrame(columns=["Name", "Points", "Team", "ID"])
-
-if bench_highlights: df_bench_stars = pd.DataFrame(bench_highlights).sort_values(by="Score", ascending=False).head(5)
-else: df_bench_stars = pd.DataFrame(columns=["Team", "Player", "Score"])
+# One immutable snapshot per (league, week, data version); widget reruns only read it
+with ui.luxury_spinner(f"Accessing Week {selected_week} Data..."):
+    try: snap = logic.get_week_snapshot(league, selected_week)
+    except Exception as e:
+        st.error(f"📡 ESPN Unavailable: {e}")
+        st.stop()
+matchup_data, df_eff, df_players, df_bench_stars = snap.matchups, snap.efficiency, snap.top_players, snap.bench_stars
 
 # ==============================================================================
 # 5. DASHBOARD UI ROUTER
@@ -168,8 +130,10 @@ else: st.info("No player data available for this week yet.")
 st.markdown("---")
 
 # --- PAGE ROUTING ---
+# Each page is a fragment: its own widgets rerun only that page, not the CSS, hero cards and data pipeline above
 
-if selected_page == "The Ledger":
+@st.fragment
+def page_ledger():
     st.header("📜 The Ledger")
     st.caption("Where the receipts are kept and the scores are settled.")
     if "recap" not in st.session_state:
@@ -200,7 +164,8 @@ if selected_page == "The Ledger":
                     df_match = pd.DataFrame({f"{m['Home']} Player": h_names, f"{m['Home']} Pts": h_pts, f"{m['Away']} Pts": a_pts, f"{m['Away']} Player": a_names})
                     st.dataframe(df_match, use_container_width=True, hide_index=True, column_config={f"{m['Home']} Pts": st.column_config.NumberColumn(format="%.1f"), f"{m['Away']} Pts": st.column_config.NumberColumn(format="%.1f")})
 
-elif selected_page == "The Hierarchy":
+@st.fragment
+def page_hierarchy():
     st.header("📈 The Hierarchy")
     st.caption("A ruthless ranking of who is actually good.")
     if "rank_comm" not in st.session_state:
@@ -213,7 +178,8 @@ elif selected_page == "The Hierarchy":
     cols = st.columns(3)
     for i, row in st.session_state["df_advanced"].reset_index(drop=True).iterrows(): ui.render_team_card(cols[i % 3], row, i+1)
 
-elif selected_page == "The Audit":
+@st.fragment
+def page_audit():
     st.header("🔎 The Audit")
     st.caption("Forensic analysis of your lineup decisions.")
     if "audit_data" not in st.session_state: st.session_state["audit_data"] = logic.analyze_lineup_efficiency(league, current_week)
@@ -221,27 +187,38 @@ elif selected_page == "The Audit":
     if not df_audit.empty:
         cols = st.columns(3)
         for i, row in df_audit.reset_index(drop=True).iterrows(): ui.render_audit_card(cols[i % 3], row)
+        with st.expander("📜 Season Audit History"):
+            hist = logic.audit_history(league, current_week)
+            names = {t.team_id: t.team_name for t in league.teams}
+            season = hist.assign(Team=hist['team_id'].map(names)).dropna(subset=['Team']).groupby('Team').agg(**{'Lost Pts': ('Lost Pts', 'sum'), 'Perfect Weeks': ('Grade', lambda g: (g == "A+").sum()), 'Efficiency': ('Efficiency', 'mean')})
+            st.dataframe(season.sort_values('Lost Pts', ascending=False), use_container_width=True, column_config={"Lost Pts": st.column_config.NumberColumn(format="%.1f"), "Efficiency": st.column_config.NumberColumn(format="%.1f%%")})
     else: st.info("No audit data available.")
 
-elif selected_page == "The Hedge Fund":
+@st.fragment
+def page_hedge_fund():
     st.header("💎 The Hedge Fund")
     st.caption("Advanced metrics for the sophisticated investor.")
     if "df_advanced" not in st.session_state:
         if st.button("🚀 Analyze Market Data"):
-            with ui.luxury_spinner("Compiling Assets..."): st.session_state["df_advanced"] = logic.calculate_heavy_analytics(league, current_week); st.rerun()
+            with ui.luxury_spinner("Compiling Assets..."): st.session_state["df_advanced"] = logic.calculate_heavy_analytics(league, current_week); rerun_page()
     else:
         fig = px.scatter(st.session_state["df_advanced"], x="Power Score", y="Wins", text="Team", size="Points For", color="Luck Rating", color_continuous_scale=["#7209b7", "#4361ee", "#4cc9f0"], title="Luck Matrix", height=600)
         fig.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font_color="#a0aaba")
         st.plotly_chart(fig, use_container_width=True)
+        df_luck = logic.calculate_luck_trajectory(league, current_week)
+        fig = px.line(df_luck, x="Week", y="Luck Rating", color="Team", markers=True, title="Luck Ticker", height=500)
+        fig.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font_color="#a0aaba")
+        st.plotly_chart(fig, use_container_width=True)
 
-elif selected_page == "The IPO Audit":
+@st.fragment
+def page_ipo_audit():
     st.header("📊 The IPO Audit")
     st.caption("ROI Analysis on Draft Capital vs. Actual Returns.")
     if "draft_roi" not in st.session_state:
         if st.button("📠 Run Audit"):
              with ui.luxury_spinner("Auditing draft capital..."):
                  df_roi, prescient = logic.calculate_draft_analysis(league)
-                 st.session_state["draft_roi"] = df_roi; st.session_state["prescient"] = prescient; st.rerun()
+                 st.session_state["draft_roi"] = df_roi; st.session_state["prescient"] = prescient; rerun_page()
     else:
         df_roi, prescient = st.session_state["draft_roi"], st.session_state["prescient"]
         st.markdown(f"""<div class="luxury-card" style="border-left: 4px solid #92FE9D; background: linear-gradient(90deg, rgba(146, 254, 157, 0.1), rgba(17, 25, 40, 0.8)); display: flex; align-items: center;"><div style="flex: 1; text-align: center;"><img src="{prescient['Logo']}" style="width: 90px; border-radius: 50%; border: 3px solid #92FE9D;"></div><div style="flex: 3; padding-left: 20px;"><h3 style="color: #92FE9D; margin: 0;">The Prescient One</h3><div style="font-size: 1.8rem; font-weight: 900; color: white;">{prescient['Team']}</div><div style="color: #a0aaba; font-size: 1.1rem;">Generated <b>{prescient['Points']:.0f} points</b> from waivers while securing <b>{prescient['Wins']} Wins</b>.</div></div></div>""", unsafe_allow_html=True)
@@ -258,18 +235,19 @@ elif selected_page == "The IPO Audit":
                 st.dataframe(df_roi[df_roi["Round"] <= 3].sort_values(by="Points", ascending=True).head(10)[["Player", "Team", "Round", "Points"]], use_container_width=True, hide_index=True)
         else: st.info("Draft data unavailable.")
 
-elif selected_page == "The Lab":
+@st.fragment
+def page_lab():
     st.header("🧬 The Lab")
     st.caption("Next Gen Stats for the analytically inclined.")
     c1, c2 = st.columns([3, 1])
     with c1: target_team = st.selectbox("Select Test Subject:", [t.team_name for t in league.teams])
     with c2:
          if st.button("🧪 Analyze"):
-             with ui.luxury_spinner("Calibrating..."): st.session_state["trigger_lab"] = True; st.rerun()
+             with ui.luxury_spinner("Calibrating..."): st.session_state["trigger_lab"] = True; rerun_page()
     if st.session_state.get("trigger_lab"):
         roster_obj = next(t for t in league.teams if t.team_name == target_team).roster
         st.session_state["ngs_data"] = logic.analyze_nextgen_metrics_v3(roster_obj, YEAR, current_week)
-        st.session_state["trigger_lab"] = False; st.rerun()
+        st.session_state["trigger_lab"] = False; rerun_page()
     if "ngs_data" in st.session_state:
         if not st.session_state["ngs_data"].empty:
             df_ngs = st.session_state["ngs_data"]
@@ -294,20 +272,21 @@ elif selected_page == "The Lab":
                          st.info(assessment)
         else: st.info("No Next Gen data available.")
 
-elif selected_page == "The Forecast":
+@st.fragment
+def page_forecast():
     st.header("🔮 The Crystal Ball")
-    st.caption("Monte Carlo simulations running 1,000 realities.")
+    st.caption("Monte Carlo simulations, run until every team's odds are pinned to ±0.5%.")
     if "playoff_odds" not in st.session_state:
         if st.button("🎲 Run Simulation"):
-            with ui.luxury_spinner("Simulating..."): st.session_state["playoff_odds"] = logic.run_monte_carlo_simulation(league); st.rerun()
-    else: st.dataframe(st.session_state["playoff_odds"], use_container_width=True, hide_index=True, column_config={"Playoff Odds": st.column_config.ProgressColumn("Prob", format="%.1f%%", min_value=0, max_value=1.0)})
+            with ui.luxury_spinner("Simulating..."): st.session_state["playoff_odds"] = logic.run_monte_carlo_simulation(league); rerun_page()
+    else: st.dataframe(st.session_state["playoff_odds"], use_container_width=True, hide_index=True, column_config={"Playoff Odds": st.column_config.ProgressColumn("Prob", format="%.1f%%", min_value=0, max_value=1.0), "Title": st.column_config.ProgressColumn("🏆 Title", format="%.1f%%", min_value=0, max_value=1.0), "Magic #": st.column_config.NumberColumn(help="Further wins that clinch a spot whatever else happens", format="%d"), "CI Low": st.column_config.NumberColumn("95% Low", format="%.3f"), "CI High": st.column_config.NumberColumn("95% High", format="%.3f"), "Sims": st.column_config.NumberColumn(format="%d")})
 
-elif selected_page == "The Multiverse":
+@st.fragment
+def page_multiverse():
     st.header("🌌 The Multiverse")
     st.caption("Control the timeline.")
-    if "base_odds" not in st.session_state:
-        with ui.luxury_spinner("Calculating Baseline..."): st.session_state["base_odds"] = logic.run_monte_carlo_simulation(league)
-    box = league.box_scores(week=league.current_week)
+    with ui.luxury_spinner("Calculating Baseline..."): logic.get_baseline_simulation(league)
+    box = network.fetch_week(league, league.current_week)
     forced = []
     with st.form("multi_form"):
         st.markdown("### 🔮 Pick This Week's Winners")
@@ -318,15 +297,16 @@ elif selected_page == "The Multiverse":
             if "Simulate" not in choice: forced.append(home_n if home_n in choice else away_n)
         if st.form_submit_button("🚀 Run Simulation"):
             res = logic.run_multiverse_simulation(league, forced)
-            st.session_state["multi_res"] = res; st.rerun()
+            st.session_state["multi_res"] = res; rerun_page()
     if "multi_res" in st.session_state: st.dataframe(st.session_state["multi_res"], use_container_width=True, hide_index=True, column_config={"New Odds": st.column_config.ProgressColumn("New Odds", min_value=0, max_value=1.0, format="%.1f%%"), "Base": st.column_config.NumberColumn(format="%.1f%%"), "Impact": st.column_config.NumberColumn(format="%+.1f%%")})
 
-elif selected_page == "Next Week":
+@st.fragment
+def page_next_week():
     try:
         st.header("🚀 Next Week")
         st.caption("A look ahead at the upcoming slate.")
         next_week = league.current_week
-        box = league.box_scores(week=next_week)
+        box = network.fetch_week(league, next_week)
         games = [{"home": g.home_team.team_name, "away": g.away_team.team_name, "spread": f"{abs(g.home_projected-g.away_projected):.1f}"} for g in box]
         if "next_week_comm" not in st.session_state:
             with ui.luxury_spinner("Checking Vegas..."): st.session_state["next_week_comm"] = intel.get_next_week_preview(OPENAI_KEY, games)
@@ -338,7 +318,8 @@ elif selected_page == "Next Week":
                  st.markdown(f"""<div class="luxury-card" style="padding: 15px;"><div style="display:flex; justify-content:space-between; text-align:center;"><div style="flex:2; color:white;"><b>{g.home_team.team_name}</b><br><span style="color:#00C9FF;">{g.home_projected:.1f}</span></div><div style="flex:1; color:#a0aaba; font-size:0.8em;">VS</div><div style="flex:2; color:white;"><b>{g.away_team.team_name}</b><br><span style="color:#92FE9D;">{g.away_projected:.1f}</span></div></div></div>""", unsafe_allow_html=True)
     except: st.info("Projections unavailable.")
 
-elif selected_page == "The Prop Desk":
+@st.fragment
+def page_prop_desk():
     st.header("📊 The Prop Desk")
     st.caption("Vegas knows.")
     with st.expander("📘 Legend & Glossary", expanded=False):
@@ -373,7 +354,8 @@ elif selected_page == "The Prop Desk":
                     for i, row in df.reset_index(drop=True).iterrows(): ui.render_prop_card(cols[i % 3], row)
         else: st.info("No data available.")
 
-elif selected_page == "The Dealmaker":
+@st.fragment
+def page_dealmaker():
     st.header("🤝 The Dealmaker")
     c1, c2 = st.columns(2)
     with c1: t1 = st.selectbox("Team A", [t.team_name for t in league.teams], index=0)
@@ -386,7 +368,8 @@ elif selected_page == "The Dealmaker":
             rb = [f"{p.name} ({p.position})" for p in tb.roster]
             st.markdown(f'<div class="luxury-card studio-box"><h3>Proposal</h3>{intel.get_ai_trade_proposal(OPENAI_KEY, t1, t2, ra, rb)}</div>', unsafe_allow_html=True)
 
-elif selected_page == "The Dark Pool":
+@st.fragment
+def page_dark_pool():
     st.header("🕵️ The Dark Pool")
     if st.button("🔭 Scan Wire"):
          with ui.luxury_spinner("Scouting..."):
@@ -395,12 +378,13 @@ elif selected_page == "The Dark Pool":
              if not df.empty:
                  p_str = ", ".join([f"{r['Name']} ({r['Position']})" for i, r in df.iterrows()])
                  st.session_state["scout_rpt"] = intel.get_ai_scouting_report(OPENAI_KEY, p_str)
-             st.rerun()
+             rerun_page()
     if "dark_pool_data" in st.session_state:
         st.markdown(st.session_state.get("scout_rpt", ""))
         st.dataframe(st.session_state["dark_pool_data"], use_container_width=True)
 
-elif selected_page == "Trophy Room":
+@st.fragment
+def page_trophy_room():
     st.header("🏆 Trophy Room")
     if "awards" not in st.session_state:
         if st.button("🏅 Unveil Awards"):
@@ -408,7 +392,7 @@ elif selected_page == "Trophy Room":
                 st.session_state["awards"] = logic.calculate_season_awards(league, current_week)
                 aw = st.session_state["awards"]
                 st.session_state["season_comm"] = intel.get_season_retrospective(OPENAI_KEY, aw['MVP']['Name'], aw['Best Manager']['Team'])
-                st.rerun()
+                rerun_page()
     else:
         aw = st.session_state["awards"]
         if "season_comm" in st.session_state: st.markdown(f'<div class="luxury-card studio-box"><h3>🎙️ State of the League</h3>{st.session_state["season_comm"]}</div>', unsafe_allow_html=True)
@@ -446,7 +430,8 @@ elif selected_page == "Trophy Room":
         blowout = aw['Blowout']
         with t2: st.markdown(f"""<div class="luxury-card shame-card"><div style="color:#FF4B4B; font-weight:bold;">💥 BIGGEST BLOWOUT</div><div style="font-size:1.5rem; font-weight:900; color:white; margin:10px 0;">{blowout['Loser']}</div><div style="color:#aaa;">Def. by {blowout['Winner']} (+{blowout['Margin']:.1f})</div><div class="award-blurb" style="color:#FF8888;">{gen_nar("Blowout", blowout['Loser'], blowout['Margin'])}</div></div>""", unsafe_allow_html=True)
 
-elif selected_page == "The Vault":
+@st.fragment
+def page_vault():
     st.header("⏳ The Dynasty Vault")
     if "dynasty_lead" not in st.session_state:
         if st.button("🔓 Unlock Vault"):
@@ -454,9 +439,27 @@ elif selected_page == "The Vault":
                 df_raw = logic.get_dynasty_data(LEAGUE_ID, ESPN_S2, SWID, YEAR, START_YEAR)
                 st.session_state["dynasty_lead"] = logic.process_dynasty_leaderboard(df_raw)
                 st.session_state["dynasty_raw"] = df_raw
-                st.rerun()
+                rerun_page()
     else:
         st.dataframe(st.session_state["dynasty_lead"], use_container_width=True)
         fig = px.line(st.session_state["dynasty_raw"], x="Year", y="Wins", color="Manager", markers=True)
         fig.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font_color="#a0aaba")
         st.plotly_chart(fig, use_container_width=True)
+
+PAGES = {
+    "The Ledger": page_ledger,
+    "The Hierarchy": page_hierarchy,
+    "The Audit": page_audit,
+    "The Hedge Fund": page_hedge_fund,
+    "The IPO Audit": page_ipo_audit,
+    "The Lab": page_lab,
+    "The Forecast": page_forecast,
+    "The Multiverse": page_multiverse,
+    "Next Week": page_next_week,
+    "The Prop Desk": page_prop_desk,
+    "The Dealmaker": page_dealmaker,
+    "The Dark Pool": page_dark_pool,
+    "Trophy Room": page_trophy_room,
+    "The Vault": page_vault,
+}
+PAGES[selected_page]()
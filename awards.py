@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIG ---
+TEAM_FIELDS = ["Bench", "Starters", "WaiverPts", "Injuries", "Wins", "PointsFor"]
+INJURED = ['OUT', 'IR', 'RESERVE', 'SUSPENDED']
+
+# --- RUNNING STATE ---
+def empty_state():
+    """
+    Season-to-date award totals. JSON-safe so it can be stored per finalized week:
+    teams {team_id: TEAM_FIELDS}, players {player_id: [name, first team_id, points]} in first-seen order,
+    and the single-game records keyed by team id.
+    """
+    return {
+        "week": 0, "teams": {}, "players": {},
+        "single": {"Team": None, "Score": 0, "Week": 0},
+        "blowout": {"Winner": None, "Loser": None, "Margin": 0, "Week": 0},
+        "heartbreaker": {"Winner": None, "Loser": None, "Margin": 999, "Week": 0},
+    }
+
+def fold_week(state, week, games, lineups, team_ids):
+    """Returns a new state with one week's games and lineups added. Ties keep the earlier record, as a full rescan would."""
+    state = {**state, "week": int(week), "teams": dict(state["teams"]), "players": dict(state["players"])}
+    games = games[games['home_id'].isin(team_ids) & games['away_id'].isin(team_ids)].reset_index(drop=True)
+    if not games.empty:
+        home, away = games['home_score'].to_numpy(float), games['away_score'].to_numpy(float)
+        margin = np.abs(home - away)
+        home_won = home > away
+        winner = np.where(home_won, games['home_id'], games['away_id'])
+        loser = np.where(home_won, games['away_id'], games['home_id'])
+        b, h = int(margin.argmax()), int(margin.argmin())
+        if margin[b] > state["blowout"]["Margin"]:
+            state["blowout"] = {"Winner": int(winner[b]), "Loser": int(loser[b]), "Margin": float(margin[b]), "Week": int(week)}
+        if margin[h] < state["heartbreaker"]["Margin"]:
+            state["heartbreaker"] = {"Winner": int(winner[h]), "Loser": int(loser[h]), "Margin": float(margin[h]), "Week": int(week)}
+        # Interleave home/away per game so ties resolve in the same order as long_scores
+        ids, scores = np.column_stack([games['home_id'], games['away_id']]).ravel(), np.column_stack([home, away]).ravel()
+        top = int(scores.argmax())
+        if scores[top] > state["single"]["Score"]:
+            state["single"] = {"Team": int(ids[top]), "Score": float(scores[top]), "Week": int(week)}
+        regular = games[games['is_playoff'] == 0]
+        decided = regular[regular['home_score'] != regular['away_score']]
+        wins = pd.Series(np.where(decided['home_score'] > decided['away_score'], decided['home_id'], decided['away_id'])).value_counts()
+        pf = pd.concat([regular.set_index('home_id')['home_score'], regular.set_index('away_id')['away_score']]).groupby(level=0).sum()
+    else:
+        wins = pf = pd.Series(dtype=float)
+    lineups = lineups[lineups['team_id'].isin(team_ids)]
+    is_bench = lineups['slot'] == 'BE'
+    per_team = pd.DataFrame({
+        "Bench": lineups['points'].where(is_bench, 0), "Starters": lineups['points'].where(~is_bench, 0),
+        "WaiverPts": lineups['points'].where(lineups['acquisition'] == 'ADD', 0),
+        "Injuries": lineups['injury'].str.upper().isin(INJURED).astype(int)
+    }).groupby(lineups['team_id']).sum().reindex(list(team_ids), fill_value=0).assign(Wins=wins, PointsFor=pf).fillna(0)
+    for tid, row in per_team.iterrows():
+        prev = state["teams"].get(str(tid), [0] * len(TEAM_FIELDS))
+        state["teams"][str(tid)] = [float(a + b) for a, b in zip(prev, row[TEAM_FIELDS])]
+    first = lineups.drop_duplicates('player_id').set_index('player_id')
+    for pid, pts in lineups.groupby('player_id', sort=False)['points'].sum().items():
+        name, owner, total = state["players"].get(str(pid), [first.at[pid, 'name'], int(first.at[pid, 'team_id']), 0.0])
+        state["players"][str(pid)] = [name, owner, float(total + pts)]
+    return state
+
+# --- QUERIES ---
+def team_totals(state, team_ids):
+    """team_id x TEAM_FIELDS frame of season-to-date totals."""
+    rows = [state["teams"].get(str(t), [0.0] * len(TEAM_FIELDS)) for t in team_ids]
+    return pd.DataFrame(rows, index=list(team_ids), columns=TEAM_FIELDS)
+
+def mvp(state):
+    """(player_id, name, owner team_id, points) of the top scorer; the first-seen player wins ties."""
+    if not state["players"]: return None
+    pid, (name, owner, pts) = max(state["players"].items(), key=lambda kv: kv[1][2])
+    return int(pid), name, owner, pts
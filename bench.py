@@ -0,0 +1,56 @@
+"""
+Offline benchmark for the heavy logic paths.
+
+    LUX_REPLAY_MODE=record python bench.py                              # once, against the live services
+    LUX_REPLAY_MODE=replay LUX_REPLAY_LATENCY=0.15 python bench.py      # deterministic, no network
+
+Credentials are read the same way app.py reads them (env vars).
+"""
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("LUX_REPLAY_MODE", "replay")
+os.environ.setdefault("LUX_CACHE_DIR", tempfile.mkdtemp(prefix="lux_bench_"))
+
+import streamlit as st
+import cache
+import logic
+import store
+
+YEAR = int(os.getenv("LUX_YEAR", "2025"))
+
+def reset_caches():
+    # Every timing starts cold: Streamlit data and resource caches, the league_cached memory layer, the on-disk store,
+    # result files and the nflverse Arrow copies
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    cache.clear()
+    for path in glob.glob(f"{store.DB_PATH}*"): os.remove(path)
+    shutil.rmtree(store.RESULTS_DIR, ignore_errors=True)
+    shutil.rmtree(os.path.join(store.CACHE_DIR, "nflverse"), ignore_errors=True)
+
+def timed(label, fn, *args, **kwargs):
+    reset_caches()
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    print(f"{label:<32} {time.perf_counter() - t0:8.3f}s")
+    return result
+
+def main():
+    env = lambda k: os.getenv(k) or os.getenv(k.upper())
+    league = timed("get_league", logic.get_league, env("league_id"), YEAR, env("espn_s2"), env("swid"))
+    week = max(league.current_week, 1)
+    timed("calculate_heavy_analytics", logic.calculate_heavy_analytics, league, week)
+    timed("calculate_season_awards", logic.calculate_season_awards, league, week)
+    timed("analyze_nextgen_metrics_v3", logic.analyze_nextgen_metrics_v3, league.teams[0].roster, YEAR, week)
+    timed("run_monte_carlo_simulation", logic.run_monte_carlo_simulation, league, seed=0)
+    timed("run_multiverse_simulation", logic.run_multiverse_simulation, league, [league.teams[0].team_name], seed=0)
+    if env("odds_api_key"): timed("get_vegas_props", logic.get_vegas_props, env("odds_api_key"), league, week)
+    else: print("get_vegas_props                  skipped (no odds_api_key)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import functools
+import hashlib
+import inspect
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import store
+
+# --- CONFIG ---
+MEM_ENTRIES = 128
+LEASE_SECONDS = 300
+LEASE_POLL = 0.25
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+# --- DATA VERSION ---
+def data_version(league):
+    """
+    (last finalized week, roster stamp) for a league. Weeks before current_week are final (the same rule store.load_season
+    uses), and the stamp is a checksum of every team's roster and record, so adds, drops, trades and settled results all
+    move it without an extra ESPN call.
+    """
+    rosters = sorted((t.team_id, t.wins, t.losses, getattr(t, 'ties', 0), tuple(sorted(getattr(p, 'playerId', 0) for p in getattr(t, 'roster', []))))
+                     for t in league.teams)
+    return max(league.current_week - 1, 0), zlib.crc32(repr(rosters).encode())
+
+def cache_key(fn, league, arguments):
+    version = data_version(league)
+    raw = pickle.dumps((fn.__module__, fn.__qualname__, str(league.league_id), int(league.year), version, sorted(arguments.items())))
+    return hashlib.sha1(raw).hexdigest()
+
+# --- MEMORY LAYER ---
+def _remember(key, value, expires):
+    with _lock:
+        _memory[key] = (value, expires)
+        _memory.move_to_end(key)
+        while len(_memory) > MEM_ENTRIES: _memory.popitem(last=False)
+
+def _recall(key):
+    with _lock:
+        hit = _memory.get(key)
+        if hit is None: return None
+        if hit[1] is not None and hit[1] < time.time():
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return hit
+
+def clear():
+    with _lock: _memory.clear()
+
+# --- DECORATOR ---
+def _shared(key, ttl):
+    """Result from this process's LRU or the shared on-disk store, or None. Spill files evicted under us count as a miss."""
+    hit = _recall(key)
+    row = (hit[0], None) if hit is not None else store.load_cached(key, ttl)
+    if row is None: return None
+    try: value = store.loads(row[0])
+    except: return None
+    if hit is None: _remember(key, row[0], row[1] + ttl if ttl else None)
+    return value,
+
+def league_cached(ttl=None, persist=True):
+    """
+    Caches a function that takes `_league`, keyed on league id, season, data_version and the remaining arguments.
+    Results are pickled like st.cache_data, kept in a per-process LRU and, with `persist`, in the size-bounded store shared by
+    every app process: one worker computes a key while the others wait on its lease and then map the result.
+    With persist=False the object itself is shared in memory, like st.cache_resource.
+    """
+    def decorate(fn):
+        sig = inspect.signature(fn)
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            league = arguments.pop('_league')
+            key = cache_key(fn, league, arguments)
+            if not persist:
+                hit = _recall(key)
+                if hit is not None: return hit[0]
+                value = fn(*args, **kwargs)
+                _remember(key, value, time.time() + ttl if ttl else None)
+                return value
+            found = _shared(key, ttl)
+            if found: return found[0]
+            owner = store.acquire_lease(key, LEASE_SECONDS)
+            try:
+                if not owner:
+                    deadline = time.time() + LEASE_SECONDS
+                    while time.time() < deadline and not store.acquire_lease(key, LEASE_SECONDS):
+                        time.sleep(LEASE_POLL)
+                        found = _shared(key, ttl)
+                        if found: return found[0]
+                    owner = True
+                    found = _shared(key, ttl)
+                    if found: return found[0]
+                value = fn(*args, **kwargs)
+                now = time.time()
+                try: payload, size = store.dumps(value, key, now)
+                except: return value
+                _remember(key, payload, now + ttl if ttl else None)
+                store.save_cached(key, fn.__qualname__, payload, size, now)
+                return value
+            finally:
+                if owner: store.release_lease(key)
+        wrapper.clear = clear
+        return wrapper
+    return decorate
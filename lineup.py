@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIG ---
+BENCH_SLOTS = {'BE', 'IR'}
+
+# --- SLOT PLAN ---
+def starting_slots(slot_counts):
+    """[(slot, count)] for every starting slot in the league's roster settings."""
+    return [(slot, int(n)) for slot, n in (slot_counts or {}).items() if n and slot not in BENCH_SLOTS]
+
+def eligibility(lineups, slots):
+    """Players x slots bool matrix from the pipe-joined eligible column; a player with none recorded can fill their own position."""
+    eligible = lineups['eligible'].fillna('').where(lineups['eligible'].fillna('') != '', lineups['position'].fillna(''))
+    return np.column_stack([eligible.str.split('|').apply(lambda e, s=s: s in e).to_numpy(bool) for s, _ in slots]) if slots else np.zeros((len(lineups), 0), bool)
+
+# --- SOLVER ---
+def optimal_lineups(lineups, slot_counts):
+    """
+    Best possible starting lineup for every (week, team_id) in `lineups` at once.
+
+    Exact dynamic program over players, vectorized across every team-week: the state is how many of each
+    starting slot are already filled (mixed radix), and each player either sits or takes one open slot they
+    are eligible for. Returns (totals, chosen): a frame of optimal points per (week, team_id), and a bool
+    Series aligned with `lineups` marking the players in the optimal lineup.
+    """
+    slots = starting_slots(slot_counts)
+    lineups = lineups.reset_index(drop=True)
+    keys = lineups[['week', 'team_id']]
+    problem = keys.groupby(['week', 'team_id'], sort=True).ngroup().to_numpy()
+    seat = keys.groupby(['week', 'team_id'], sort=True).cumcount().to_numpy()
+    n_problems, n_seats = (problem.max() + 1, seat.max() + 1) if len(lineups) else (0, 0)
+    elig = np.zeros((n_problems, n_seats, len(slots)), bool)
+    pts = np.zeros((n_problems, n_seats))
+    elig[problem, seat] = eligibility(lineups, slots)
+    pts[problem, seat] = lineups['points'].fillna(0).to_numpy(float)
+
+    caps = np.array([n for _, n in slots], dtype=int)
+    strides = np.cumprod(np.r_[1, caps[:-1] + 1]) if len(caps) else np.zeros(0, int)
+    n_states = int(np.prod(caps + 1))
+    filled = (np.arange(n_states)[:, None] // strides) % (caps + 1) if len(caps) else np.zeros((1, 0), int)
+    best = np.full((n_problems, n_states), -np.inf)
+    best[:, 0] = 0.0
+    # choice[p, r, s]: slot index + 1 that seat r took on the best path into state s (0 = sat)
+    choice = np.zeros((n_problems, n_seats, n_states), dtype=np.int8)
+    rows = np.arange(n_problems)[:, None]
+    for r in range(n_seats):
+        nxt = best.copy()
+        for k in range(len(slots)):
+            src = np.flatnonzero(filled[:, k] < caps[k])
+            cand = np.where(elig[:, r, k][:, None], best[:, src] + pts[:, r][:, None], -np.inf)
+            better = cand > nxt[:, src + strides[k]]
+            nxt[:, src + strides[k]] = np.where(better, cand, nxt[:, src + strides[k]])
+            choice[:, r, src + strides[k]] = np.where(better, k + 1, choice[:, r, src + strides[k]])
+        best = nxt
+
+    # Walk each problem's best path back from its best end state
+    state = best.argmax(axis=1)
+    started = np.zeros((n_problems, n_seats), bool)
+    for r in range(n_seats - 1, -1, -1):
+        k = choice[rows[:, 0], r, state]
+        started[:, r] = k > 0
+        state = state - np.where(k > 0, strides[np.maximum(k - 1, 0)] if len(strides) else 0, 0)
+    groups = keys.drop_duplicates().sort_values(['week', 'team_id']).reset_index(drop=True)
+    totals = groups.assign(optimal=best.max(axis=1) if n_states else 0.0)
+    return totals, pd.Series(started[problem, seat], index=lineups.index)
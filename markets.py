@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIG ---
+MARKET_COLS = ['event_id', 'book', 'market', 'name', 'player', 'point', 'price']
+PROP_MARKETS = {'player_pass_yds': 'pass', 'player_rush_yds': 'rush', 'player_reception_yds': 'rec', 'player_anytime_td': 'td'}
+PROP_WEIGHTS = {'pass': 0.04, 'rush': 0.1, 'rec': 0.1, 'td': 6}
+
+# --- INGESTION ---
+def flatten_markets(events):
+    """One long row per (event, bookmaker, market, outcome) from Odds API event payloads."""
+    rows = [(ev['id'], bm.get('key'), mkt['key'], out.get('name'), out.get('description'), out.get('point', np.nan), out.get('price', np.nan))
+            for ev in events if ev for bm in ev.get('bookmakers', []) for mkt in bm.get('markets', []) for out in mkt.get('outcomes', [])]
+    return pd.DataFrame(rows, columns=MARKET_COLS)
+
+def implied_probability(price):
+    price = np.asarray(price, float)
+    return np.where(price > 0, 100 / (price + 100), np.abs(price) / (np.abs(price) + 100))
+
+def game_lines(long):
+    """Consensus (median across books) total and absolute spread per event."""
+    lines = long[long['market'].isin(['totals', 'spreads'])].assign(point=lambda d: d['point'].abs())
+    lines = lines.groupby(['event_id', 'market'])['point'].median().unstack()
+    return lines.reindex(columns=['totals', 'spreads']).fillna(0).set_axis(['total', 'spread'], axis=1)
+
+def consensus_props(long, games=None):
+    """
+    Player x market table of consensus lines: the median yardage line and median anytime-TD probability across every book.
+    Each player carries the game context of the first event they were listed in.
+    """
+    props = long[long['market'].isin(PROP_MARKETS) & long['player'].notna()]
+    props = props[(props['market'] != 'player_anytime_td') | (props['name'] != 'No')]
+    # One vote per book: a book posting both Over and Under must not count twice against one posting a single side
+    props = props.drop_duplicates(['event_id', 'book', 'market', 'player'])
+    value = np.where(props['market'] == 'player_anytime_td', implied_probability(props['price']), props['point'])
+    props = props.assign(value=value, stat=props['market'].map(PROP_MARKETS))
+    table = props.pivot_table(index='player', columns='stat', values='value', aggfunc='median', sort=False)
+    table = table.reindex(columns=list(PROP_WEIGHTS)).fillna(0)
+    # Matched by player label: pivot_table drops players whose values are all NaN, so row positions can't be trusted
+    event = props.groupby('player', sort=False)['event_id'].first().reindex(table.index)
+    context = (games if games is not None else pd.DataFrame(columns=['total', 'spread'])).reindex(event.to_numpy()).fillna(0)
+    return table.assign(total=context['total'].to_numpy(), spread=context['spread'].to_numpy())
+
+# --- SCORING ---
+def score_props(props, positions):
+    """Vegas-implied fantasy points, verdict tier and insight tag for every row at once."""
+    score = sum(props[k] * w for k, w in PROP_WEIGHTS.items())
+    qb = np.asarray(positions) == 'QB'
+    verdict = np.select(
+        [qb & (score >= 20), qb & (score >= 16), qb, score >= 15, score >= 12],
+        ["🔥 Elite QB1", "💎 QB1", "🆗 Streamer", "🔥 Must Start", "💎 RB1/WR1"], "🆗 Flex Play")
+    insight = np.select(
+        [props['total'] > 48, props['spread'].abs() > 9.5, props['rush'] > 80, props['td'] > 0.45],
+        ["🔥 Barn Burner", "🗑️ Garbage Time", "🚜 Workhorse", "🎯 Redzone"], "")
+    return props.assign(score=score, verdict=verdict, insight=insight)
+
+def hit_rate_lines(props):
+    """(stat index into FORM_STATS, line) per row: the passing line if there is one, else rushing, else receiving."""
+    conds = [props['pass'] > 0, props['rush'] > 0, props['rec'] > 0]
+    return np.select(conds, [0, 1, 2], -1), np.select(conds, [props['pass'], props['rush'], props['rec']], 0.0)
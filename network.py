@@ -0,0 +1,178 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from espn_api.requests.espn_requests import ESPNUnknownError
+import store
+
+# --- CONFIG ---
+MAX_WORKERS = 6
+RETRIES = 3
+BASE_DELAY = 0.5
+MAX_DELAY = 8.0
+
+class CircuitOpenError(Exception):
+    pass
+
+class QuotaExhaustedError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Fails fast after `threshold` consecutive transient failures, then lets one probe through after `cooldown` seconds."""
+    def __init__(self, name, threshold=5, cooldown=60):
+        self.name, self.threshold, self.cooldown = name, threshold, cooldown
+        self.failures, self.opened_at = 0, None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None: return
+            if time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpenError(f"{self.name} is unavailable, retrying in {self.cooldown - (time.monotonic() - self.opened_at):.0f}s")
+            self.opened_at = time.monotonic()  # half-open: this caller probes, the rest keep failing fast
+
+    def record_success(self):
+        with self._lock: self.failures, self.opened_at = 0, None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold: self.opened_at = time.monotonic()
+
+ESPN_BREAKER = CircuitBreaker("ESPN")
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, ESPNUnknownError)
+
+def is_transient(exc):
+    # Only network hiccups and server-side errors are retried; parsing bugs, bad credentials or an unsupported season
+    # fail the same way every time and must not count toward the breaker
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and (exc.response.status_code == 429 or exc.response.status_code >= 500)
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+def backoff_delay(attempt):
+    # "Full jitter": spreads concurrent retries out instead of having them hit ESPN in lockstep
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+def call_with_retry(fn, *args, retries=RETRIES, breaker=ESPN_BREAKER, **kwargs):
+    for attempt in range(retries + 1):
+        breaker.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_transient(e): raise
+            breaker.record_failure()
+            if attempt == retries: raise
+            time.sleep(backoff_delay(attempt))
+            continue
+        breaker.record_success()
+        return result
+
+# --- ESPN WEEK FETCHER ---
+def fetch_week(league, week):
+    return call_with_retry(league.box_scores, week=week)
+
+def fetch_weeks(league, weeks, max_workers=MAX_WORKERS):
+    """Fetches box scores for many weeks in parallel; returns {week: box_scores} in week order."""
+    weeks = sorted(set(weeks))
+    if not weeks: return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(weeks))) as pool:
+        futures = {w: pool.submit(fetch_week, league, w) for w in weeks}
+        return {w: futures[w].result() for w in weeks}
+
+# --- ODDS API ---
+ODDS_URL = "https://api.the-odds-api.com/v4/sports/americanfootball_nfl"
+ODDS_WORKERS = 4
+ODDS_RETRIES = 1
+ODDS_TIMEOUT = 15
+ODDS_BREAKER = CircuitBreaker("Odds API")
+# (kickoff within, ttl): lines move fastest in the last hours before a game
+ODDS_TTLS = [(3*3600, 10*60), (24*3600, 3600)]
+ODDS_FAR_TTL = 6*3600
+
+def kickoff_ts(event):
+    try: return datetime.fromisoformat(event['commence_time'].replace('Z', '+00:00')).timestamp()
+    except: return None
+
+def odds_ttl(kickoff, now=None):
+    """Seconds a cached line stays fresh; None once the game has kicked off and the line is frozen."""
+    if kickoff is None: return ODDS_TTLS[0][1]
+    until = kickoff - (time.time() if now is None else now)
+    if until <= 0: return None
+    for window, ttl in ODDS_TTLS:
+        if until < window: return ttl
+    return ODDS_FAR_TTL
+
+def odds_cache_key(path, params):
+    return f"{path}?{json.dumps(params, sort_keys=True)}"
+
+class OddsClient:
+    """
+    Odds API calls over one pooled keep-alive session.
+    Tracks the x-requests-remaining quota header and keeps a timing record for every call in `timings`.
+    Responses are persisted in the store and reused until their kickoff-based TTL runs out.
+    """
+    def __init__(self, api_key, max_workers=ODDS_WORKERS):
+        self.api_key, self.max_workers = api_key, max_workers
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.remaining, self.timings, self.cache_hits = None, [], 0
+        self._lock = threading.Lock()
+
+    def _get(self, path, params):
+        with self._lock:
+            if self.remaining is not None and self.remaining <= 0: raise QuotaExhaustedError("Odds API quota exhausted")
+        t0 = time.perf_counter()
+        res = self.session.get(f"{ODDS_URL}/{path}", params={"apiKey": self.api_key, **params}, timeout=ODDS_TIMEOUT)
+        with self._lock:
+            try: self.remaining = int(float(res.headers["x-requests-remaining"]))
+            except (KeyError, ValueError): pass
+            self.timings.append({"path": path, "status": res.status_code, "seconds": time.perf_counter() - t0, "remaining": self.remaining})
+        res.raise_for_status()
+        return res.json()
+
+    def get(self, path, **params):
+        return call_with_retry(self._get, path, params, retries=ODDS_RETRIES, breaker=ODDS_BREAKER)
+
+    def cached(self, path, kickoff_of, freeze=True, **params):
+        """
+        Serves `path` from the on-disk cache while it is younger than the TTL for its stored kickoff.
+        With `freeze`, a response cached before kickoff is never refetched; a failed refresh falls back to the stale copy.
+        """
+        key = odds_cache_key(path, params)
+        hit = store.load_odds(key)
+        if hit:
+            ttl = odds_ttl(hit[2])
+            if ttl is None and not freeze: ttl = ODDS_TTLS[0][1]
+            if ttl is None or time.time() - hit[1] < ttl:
+                with self._lock: self.cache_hits += 1
+                return hit[0]
+        try: payload = self.get(path, **params)
+        except Exception:
+            if hit: return hit[0]
+            raise
+        store.save_odds(key, kickoff_of(payload), payload, time.time())
+        return payload
+
+    def slate(self, **params):
+        """Upcoming events with game lines, refreshed on the cadence of the next game to kick off."""
+        def next_kickoff(events):
+            return min([k for k in map(kickoff_ts, events) if k and k > time.time()], default=None)
+        return self.cached("odds", next_kickoff, freeze=False, **params)
+
+    def event_odds(self, events, **params):
+        """
+        {event_id: payload} for slate events, fetched concurrently. Each event is cached against its own kickoff,
+        so only games whose lines can still move are refetched. An event that fails maps to None instead of sinking the batch.
+        """
+        def one(event):
+            kickoff = kickoff_ts(event)
+            try: return self.cached(f"events/{event['id']}/odds", lambda _: kickoff, **params)
+            except Exception: return None
+        events = list(events)
+        if not events: return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(events))) as pool:
+            return dict(zip([e['id'] for e in events], pool.map(one, events)))
@@ -0,0 +1,256 @@
+import os
+import re
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import streamlit as st
+import nfl_data_py as nfl
+from thefuzz import fuzz
+import store
+
+# --- NAMES ---
+def normalize_name(name):
+    return re.sub(r'[^a-z0-9]', '', str(name).lower()).replace('iii','').replace('ii','').replace('jr','')
+
+def normalize_names(names):
+    """Vectorized normalize_name over a Series."""
+    return (names.astype(str).str.lower().str.replace(r'[^a-z0-9]', '', regex=True)
+            .str.replace('iii', '', regex=False).str.replace('ii', '', regex=False).str.replace('jr', '', regex=False))
+
+def clean_team_abbr(abbr):
+    mapping = {'WSH': 'WAS', 'JAX': 'JAC', 'LAR': 'LA', 'LV': 'LV', 'ARZ': 'ARI', 'HST': 'HOU', 'BLT': 'BAL', 'CLV': 'CLE', 'SL': 'STL', 'KAN': 'KC', 'NWE': 'NE', 'NOS': 'NO', 'TAM': 'TB', 'GNB': 'GB', 'SFO': 'SF', 'LVR': 'LV', 'KCS': 'KC', 'TBB': 'TB', 'JAC': 'JAC', 'LAC': 'LAC'}
+    return mapping.get(abbr, abbr)
+
+# --- SCHEDULE ---
+@st.cache_data(ttl=3600*12)
+def load_schedule_index(year):
+    """
+    {week: {team: {"opponent", "home", "site", "kickoff"}}} for one season, both sides of every game.
+    Team codes go through clean_team_abbr so they line up with ESPN proTeam lookups.
+    """
+    try: sched = nfl.import_schedules([year])
+    except: return {}
+    if sched.empty: return {}
+    home, away = sched['home_team'].map(clean_team_abbr), sched['away_team'].map(clean_team_abbr)
+    kickoff = pd.to_datetime(sched['gameday'] + ' ' + sched['gametime'].fillna('13:00'), errors='coerce').dt.tz_localize('America/New_York')
+    sides = pd.concat([
+        pd.DataFrame({"week": sched['week'], "team": home, "opponent": away, "home": True, "site": home, "kickoff": kickoff}),
+        pd.DataFrame({"week": sched['week'], "team": away, "opponent": home, "home": False, "site": home, "kickoff": kickoff}),
+    ])
+    return {int(w): grp.drop(columns='week').set_index('team').to_dict('index') for w, grp in sides.groupby('week')}
+
+# --- WEEKLY STATS ---
+# Only the columns the app reads; everything else in player_stats is dropped before caching
+WEEKLY_COLUMNS = ['player_id', 'player_display_name', 'position', 'recent_team', 'season', 'week', 'opponent_team',
+                  'passing_yards', 'rushing_yards', 'receiving_yards', 'fantasy_points_ppr']
+WEEKLY_CATEGORIES = ['player_id', 'player_display_name', 'position', 'recent_team', 'opponent_team', 'norm_name']
+WEEKLY_MAX_AGE = 3600*12
+
+def compact_weekly(df):
+    df = df[[c for c in WEEKLY_COLUMNS if c in df.columns]].reset_index(drop=True)
+    df['norm_name'] = normalize_names(df['player_display_name'])
+    for c in WEEKLY_CATEGORIES:
+        if c in df.columns: df[c] = df[c].astype('category')
+    floats = df.select_dtypes('float').columns
+    df[floats] = df[floats].astype('float32')
+    if 'week' in df.columns: df['week'] = df['week'].astype('int8')
+    if 'season' in df.columns: df['season'] = df['season'].astype('int16')
+    return df
+
+def season_is_final(year):
+    # The NFL season for `year` wraps up in February of the next year
+    return datetime.now() >= datetime(year + 1, 3, 1)
+
+def weekly_cache_path(year):
+    return os.path.join(store.CACHE_DIR, "nflverse", f"weekly_{year}.arrow")
+
+def load_weekly_stats(year, max_age=WEEKLY_MAX_AGE):
+    """
+    Compact weekly player stats for one season, persisted as an uncompressed Arrow file.
+    Warm loads memory-map the file instead of re-downloading and re-normalizing the nflverse release.
+    """
+    path = weekly_cache_path(year)
+    if os.path.exists(path) and (season_is_final(year) or time.time() - os.path.getmtime(path) < max_age):
+        return store.read_arrow(path)
+    try: df = nfl.import_weekly_data([year])
+    except: df = pd.DataFrame()
+    if df.empty:
+        # nflverse unreachable: a stale copy beats no data
+        return store.read_arrow(path) if os.path.exists(path) else pd.DataFrame()
+    df = compact_weekly(df)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_feather(f"{path}.tmp", compression="uncompressed")
+    os.replace(f"{path}.tmp", path)
+    return store.read_arrow(path)
+
+# --- DEFENSE VS POSITION ---
+DVP_POSITIONS = ['QB', 'RB', 'WR', 'TE']
+
+def build_defense_cube(df):
+    """
+    Prefix sums over weeks of what each defense allowed, so any week window is two lookups.
+    'fp' / 'fp_games' are team x position x week; 'pass' / 'rush' / 'games' are team x week.
+    Index 0 on the week axis is an all-zero column, so the window (a, b] is cum[..., b] - cum[..., a].
+    """
+    teams = sorted({clean_team_abbr(t) for t in df['opponent_team'].dropna().astype(str).unique()})
+    t_idx = df['opponent_team'].astype(str).map(clean_team_abbr).map({t: i for i, t in enumerate(teams)}).fillna(-1).to_numpy(int)
+    p_idx = df['position'].astype(str).map({p: i for i, p in enumerate(DVP_POSITIONS)}).fillna(-1).to_numpy(int)
+    weeks = df['week'].to_numpy(int)
+    n_weeks = int(weeks.max()) if len(weeks) else 0
+    shape = (len(teams), n_weeks + 1)
+    has_team, has_pos = t_idx >= 0, (t_idx >= 0) & (p_idx >= 0)
+    fp, fp_games = np.zeros((len(teams), len(DVP_POSITIONS), n_weeks + 1)), np.zeros((len(teams), len(DVP_POSITIONS), n_weeks + 1))
+    np.add.at(fp, (t_idx[has_pos], p_idx[has_pos], weeks[has_pos]), df['fantasy_points_ppr'].to_numpy(float)[has_pos])
+    fp_games[t_idx[has_pos], p_idx[has_pos], weeks[has_pos]] = 1
+    pass_yds, rush_yds, games = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    np.add.at(pass_yds, (t_idx[has_team], weeks[has_team]), df['passing_yards'].fillna(0).to_numpy(float)[has_team])
+    np.add.at(rush_yds, (t_idx[has_team], weeks[has_team]), df['rushing_yards'].fillna(0).to_numpy(float)[has_team])
+    games[t_idx[has_team], weeks[has_team]] = 1
+    cube = {"fp": fp, "fp_games": fp_games, "pass": pass_yds, "rush": rush_yds, "games": games}
+    return {"teams": teams, "weeks": n_weeks, **{k: np.cumsum(v, axis=-1) for k, v in cube.items()}}
+
+def window_totals(cube, key, last=None, through=None):
+    """Sum of cube[key] over weeks (through - last, through]; defaults to the whole season."""
+    end = cube["weeks"] if through is None else max(0, min(int(through), cube["weeks"]))
+    start = max(0, end - int(last)) if last else 0
+    return cube[key][..., end] - cube[key][..., start]
+
+def dvp_ranks(cube, last=None, through=None):
+    """{team: {position: rank}} where #1 allowed the most PPR points per game to that position in the window."""
+    if not cube["teams"]: return {}
+    games = window_totals(cube, "fp_games", last, through)
+    # Per game, like defensive_averages, so a bye in the window doesn't pass for a shutdown defense
+    pts = pd.DataFrame(window_totals(cube, "fp", last, through) / np.maximum(games, 1), index=cube["teams"], columns=DVP_POSITIONS)
+    ranks = pts.where(games > 0).rank(ascending=False)
+    dvp_map = {}
+    for team, row in ranks.iterrows():
+        ranked = {p: int(r) for p, r in row.items() if pd.notna(r)}
+        if ranked: dvp_map[team] = ranked
+    return dvp_map
+
+def defensive_averages(cube, last=None, through=None):
+    """{team: {"Pass": text, "Rush": text}} with yards allowed per game in the window."""
+    games = window_totals(cube, "games", last, through)
+    pass_avg = window_totals(cube, "pass", last, through) / np.maximum(games, 1)
+    rush_avg = window_totals(cube, "rush", last, through) / np.maximum(games, 1)
+    return {t: {'Pass': f"Allows {pass_avg[i]:.1f} Pass Yds/Gm", 'Rush': f"Allows {rush_avg[i]:.1f} Rush Yds/Gm"}
+            for i, t in enumerate(cube["teams"]) if games[i] > 0}
+
+# --- RECENT FORM ---
+FORM_STATS = ['passing_yards', 'rushing_yards', 'receiving_yards']
+FORM_MAX_GAMES = 8
+
+def build_recent_form(df, max_games=FORM_MAX_GAMES):
+    """
+    Each player's most recent games as one players x stat x game array, newest first, NaN-padded.
+    Built once per stats load so hit rates for every prop line are a single array comparison.
+    """
+    recent = df[['norm_name', 'week'] + FORM_STATS].sort_values(['norm_name', 'week'], ascending=[True, False], kind='stable')
+    recent = recent[recent['norm_name'].notna()]
+    slot = recent.groupby('norm_name', observed=True).cumcount().to_numpy()
+    recent, slot = recent[slot < max_games], slot[slot < max_games]
+    names = pd.Index(recent['norm_name'].astype(str).unique())
+    rows = names.get_indexer(recent['norm_name'].astype(str))
+    yards = np.full((len(names), len(FORM_STATS), max_games), np.nan, dtype='float32')
+    # A missing stat is a game played without reaching the line, not a game that didn't happen
+    yards[rows, :, slot] = recent[FORM_STATS].fillna(0).to_numpy('float32')
+    return {"names": names, "yards": yards}
+
+def hit_rates(form, names, stats, lines, last=5):
+    """
+    Share of each player's last `last` games at or over their line; NaN where the player has no games.
+    `stats` indexes FORM_STATS per row (-1 for no yardage line, which scores 0%). `last` is capped at the games
+    build_recent_form kept (FORM_MAX_GAMES by default); build the form with a larger max_games for longer windows.
+    """
+    rows = form["names"].get_indexer(pd.Index(names))
+    stats, lines = np.asarray(stats, int), np.asarray(lines, float)
+    last = min(max(1, int(last)), form["yards"].shape[-1])
+    window = form["yards"][np.maximum(rows, 0), np.maximum(stats, 0), :last]
+    played = (~np.isnan(window)).sum(axis=1)
+    hits = np.where(stats[:, None] >= 0, window >= lines[:, None], False).sum(axis=1)
+    return np.where((rows >= 0) & (played > 0), hits / np.maximum(played, 1), np.nan)
+
+# --- NEXT GEN STATS ---
+NGS_COLUMNS = {
+    'receiving': ['avg_separation', 'avg_intended_air_yards'],
+    'rushing': ['rush_yards_over_expected_per_att', 'percent_attempts_gte_eight_defenders', 'efficiency'],
+    'passing': ['completion_percentage_above_expectation', 'avg_time_to_throw', 'avg_intended_air_yards'],
+}
+
+def ngs_aggregates(df, stat_type):
+    """{gsis id: {metric: season mean}} for the NGS metrics the app reads."""
+    if df is None or df.empty: return {}
+    cols = [c for c in NGS_COLUMNS[stat_type] if c in df.columns]
+    return df.groupby('player_gsis_id')[cols].mean().to_dict('index')
+
+def wopr_lookup(df_seas):
+    if df_seas is None or df_seas.empty: return {}
+    # import_seasonal_data merges its computed WOPR onto the summed weekly one, which leaves wopr_x / wopr_y
+    col = 'wopr_y' if 'wopr_y' in df_seas.columns else 'wopr'
+    seas = df_seas.drop_duplicates('player_id').dropna(subset=[col])
+    return dict(zip(seas['player_id'], seas[col].astype(float)))
+
+# --- PLAYER IDENTITY ---
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+
+def last_name_key(name):
+    parts = [re.sub(r'[^a-z]', '', p) for p in str(name).lower().split()]
+    parts = [p for p in parts if p and p not in NAME_SUFFIXES]
+    return parts[-1] if parts else ''
+
+@st.cache_data(ttl=3600*24*7)
+def fetch_id_crosswalk():
+    # Raises on a failed download so st.cache_data doesn't keep an empty table for a week
+    ids = nfl.import_ids(columns=['name'], ids=['espn', 'gsis'])
+    ids = ids.assign(espn_id=pd.to_numeric(ids['espn_id'], errors='coerce')).dropna(subset=['espn_id', 'gsis_id'])
+    return dict(zip(ids['espn_id'].astype(int), ids['gsis_id'].astype(str)))
+
+def load_id_crosswalk():
+    """ESPN playerId -> nflverse gsis id, from the nflverse/dynastyprocess ID table; empty (and retried next call) if it can't be fetched."""
+    try: return fetch_id_crosswalk()
+    except: return {}
+
+def build_name_blocks(players):
+    """
+    Blocking index for the fuzzy fallback over (gsis id, name, position, team) rows.
+    Candidates are grouped by (position, last-name key) and by last-name key alone.
+    """
+    by_pos, by_last = {}, {}
+    for gsis, name, pos, team in players.itertuples(index=False):
+        key = last_name_key(name)
+        by_pos.setdefault((pos, key), []).append((name, gsis, team))
+        by_last.setdefault(key, []).append((name, gsis, team))
+    return by_pos, by_last
+
+def match_in_block(name, position, team, blocks, threshold=80):
+    by_pos, by_last = blocks
+    key = last_name_key(name)
+    pool = by_pos.get((position, key)) or by_last.get(key, [])
+    best, best_score = None, threshold
+    for cand_name, cand_id, cand_team in pool:
+        score = fuzz.token_sort_ratio(name, cand_name)
+        if score <= threshold: continue
+        if cand_team == team: score += 5  # same pro team breaks ties between namesakes
+        if score > best_score: best, best_score = cand_id, score
+    return best
+
+def resolve_players(players, year, source, crosswalk, blocks, threshold=80):
+    """
+    Resolves (key, name, position, team) rows to ids and returns {key: id}.
+    Order: the ID crosswalk, then the on-disk memo, then a fuzzy match inside the player's name block.
+    New matches are written back so each player is resolved once per season; a crosswalk hit replaces an earlier fuzzy guess.
+    """
+    known = store.load_player_ids(year, source, with_method=True)
+    resolved, new = {}, []
+    for key, name, pos, team in players:
+        (match, method), memo = (crosswalk.get(key), 'crosswalk'), known.get(str(key))
+        if memo and (not match or memo[1] == 'crosswalk'):
+            resolved[key] = memo[0]
+            continue
+        if not match: match, method = match_in_block(name, pos, team, blocks, threshold), 'fuzzy'
+        if match:
+            resolved[key] = match
+            new.append((key, match, method))
+    if new: store.save_player_ids(year, source, new)
+    return resolved
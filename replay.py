@@ -0,0 +1,111 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import pandas as pd
+import requests
+from requests.structures import CaseInsensitiveDict
+import nfl_data_py as nfl
+
+# --- CONFIG ---
+# LUX_REPLAY_MODE=record  -> hit the live services and save every response under LUX_FIXTURE_DIR
+# LUX_REPLAY_MODE=replay  -> serve the saved responses instead, sleeping LUX_REPLAY_LATENCY seconds per call
+FIXTURE_DIR = os.getenv("LUX_FIXTURE_DIR", "fixtures")
+NFL_IMPORTERS = ["import_weekly_data", "import_seasonal_data", "import_ngs_data", "import_schedules", "import_ids"]
+SECRET_PARAMS = {"apiKey", "api_key"}
+
+class ReplayMissError(LookupError):
+    pass
+
+_state = {"mode": "", "dir": FIXTURE_DIR, "latency": 0.0}
+_originals = {}
+_lock = threading.Lock()
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def _write(path, write_fn):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    write_fn(tmp)
+    os.replace(tmp, path)
+
+def _replay_wait():
+    if _state["latency"] > 0: time.sleep(_state["latency"])
+
+# --- HTTP (ESPN + ODDS API) ---
+def http_fixture_path(method, url, params=None, headers=None):
+    params = {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+    # ESPN encodes its matchup filters in a header, so it is part of the request identity
+    fantasy_filter = (headers or {}).get("x-fantasy-filter", "")
+    return os.path.join(_state["dir"], "http", urlsplit(url).netloc.replace(":", "_"), f"{_digest(method.upper(), url, params, fantasy_filter)}.json")
+
+def _load_response(path):
+    if not os.path.exists(path): raise ReplayMissError(f"No recorded response at {path}")
+    with open(path, encoding="utf-8") as f: data = json.load(f)
+    res = requests.Response()
+    res.status_code = data["status"]
+    res.headers = CaseInsensitiveDict(data["headers"])
+    res.url = data["url"]
+    res.encoding = "utf-8"
+    res._content = data["body"].encode("utf-8")
+    _replay_wait()
+    return res
+
+def _save_response(path, res, url):
+    headers = {k: v for k, v in res.headers.items() if k.lower() != "set-cookie"}
+    data = {"url": url, "status": res.status_code, "headers": headers, "body": res.text}
+    def dump(tmp):
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f)
+    _write(path, dump)
+
+def _request(self, method, url, params=None, headers=None, **kwargs):
+    path = http_fixture_path(method, url, params, headers)
+    if _state["mode"] == "replay": return _load_response(path)
+    res = _originals["request"](self, method, url, params=params, headers=headers, **kwargs)
+    _save_response(path, res, url)
+    return res
+
+# --- NFLVERSE ---
+def _wrap_importer(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        path = os.path.join(_state["dir"], "nflverse", f"{name}-{_digest(args, kwargs)}.pkl")
+        if _state["mode"] == "replay":
+            if not os.path.exists(path): raise ReplayMissError(f"No recorded frame at {path}")
+            df = pd.read_pickle(path)
+            _replay_wait()
+            return df
+        df = fn(*args, **kwargs)
+        _write(path, lambda tmp: df.to_pickle(tmp))
+        return df
+    return wrapper
+
+# --- INSTALL ---
+def install(mode, fixture_dir=FIXTURE_DIR, latency=0.0):
+    """Routes every requests.Session call and nfl_data_py importer through the fixture store."""
+    if mode not in ("record", "replay"): raise ValueError(f"Unknown replay mode: {mode}")
+    with _lock:
+        _state.update({"mode": mode, "dir": fixture_dir, "latency": float(latency)})
+        if _originals: return
+        _originals["request"] = requests.Session.request
+        requests.Session.request = _request
+        for name in NFL_IMPORTERS:
+            if hasattr(nfl, name):
+                _originals[name] = getattr(nfl, name)
+                setattr(nfl, name, _wrap_importer(name, _originals[name]))
+
+def uninstall():
+    with _lock:
+        if not _originals: return
+        requests.Session.request = _originals.pop("request")
+        for name, fn in list(_originals.items()): setattr(nfl, name, fn)
+        _originals.clear()
+        _state["mode"] = ""
+
+def install_from_env():
+    mode = os.getenv("LUX_REPLAY_MODE", "").lower()
+    if mode: install(mode, os.getenv("LUX_FIXTURE_DIR", FIXTURE_DIR), float(os.getenv("LUX_REPLAY_LATENCY", "0") or 0))
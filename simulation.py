@@ -0,0 +1,325 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# --- CONFIG ---
+SCORE_SD = 15
+BATCH = 25_000
+WORKERS = int(os.getenv("LUX_SIM_WORKERS", "0")) or os.cpu_count() or 1
+POOL_MIN_SIMS = 200_000  # below this, process start-up costs more than the simulation
+# Workers are started fresh: forking the multithreaded Streamlit server can copy a held lock into the child
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+ADAPTIVE_BATCH = 5_000
+MAX_SIMS = 1_000_000
+Z95 = 1.96
+
+# --- LEAGUE STATE ---
+def _opponent_id(team, week):
+    # Team.schedule is one entry per matchup period; a bye lists the team as its own opponent
+    if week - 1 >= len(team.schedule): return team.team_id
+    opp = team.schedule[week - 1]
+    return getattr(opp, 'team_id', opp)
+
+def playoff_field(league, n_seeds):
+    """
+    (seeds, results) once the regular season is over: team indices in ESPN's actual seed order (Team.standing), and per
+    playoff round an array over teams of 1 won / -1 lost / 0 not decided yet, read from Team.outcomes. (None, []) if
+    ESPN hasn't seeded the full field.
+    """
+    teams, reg = league.teams, league.settings.reg_season_count
+    seeded = sorted((t.standing, i) for i, t in enumerate(teams) if 0 < (getattr(t, 'standing', 0) or 0) <= n_seeds)
+    if len(seeded) < n_seeds: return None, []
+    outcome = lambda t, p: t.outcomes[p] if p < len(t.outcomes) else 'U'
+    n_rounds = int(math.ceil(math.log2(n_seeds))) if n_seeds > 1 else 0
+    results = [np.array([{'W': 1, 'L': -1}.get(outcome(t, reg + r), 0) for t in teams]) for r in range(n_rounds)]
+    return np.array([i for _, i in seeded]), results
+
+def season_state(league):
+    """
+    Standings, scoring strength and the remaining regular-season games as arrays, teams in league.teams order.
+    Games are listed week by week: home[g] / away[g] are team indices, week[g] the week they are played in.
+    From the first playoff week on there are no games left, and `seeds` / `results` hold ESPN's actual bracket and the
+    playoff rounds already decided; before that `seeds` is None and the field comes from simulated standings.
+    """
+    teams = league.teams
+    idx = {t.team_id: i for i, t in enumerate(teams)}
+    reg = league.settings.reg_season_count
+    weeks = list(range(league.current_week, reg + 1))
+    games = [(w, i, idx[o]) for w in weeks for i, t in enumerate(teams) for o in [_opponent_id(t, w)] if o in idx and idx[o] > i]
+    week, home, away = (np.array(c, dtype=int) for c in zip(*games)) if games else (np.zeros(0, dtype=int),) * 3
+    # points_for only counts the regular season, so playoff weeks don't dilute the scoring average
+    played = max(min(league.current_week - 1, reg), 1)
+    mean = np.array([t.points_for / played for t in teams], dtype=float)
+    n_seeds = getattr(league.settings, 'playoff_team_count', 4) or 4
+    seeds, results = playoff_field(league, n_seeds) if league.current_week > reg else (None, [])
+    return {
+        "names": [t.team_name for t in teams],
+        "wins": np.array([t.wins for t in teams], dtype=float),
+        "points": np.array([t.points_for for t in teams], dtype=float),
+        "mean": mean, "weeks": weeks, "week": week, "home": home, "away": away,
+        "playoff_teams": n_seeds,
+        "seeds": seeds, "results": results,
+        # Only the points tiebreak is modelled; other ESPN seeding rules (e.g. head to head) are approximated by it
+        "seed_tiebreak": getattr(league.settings, 'playoff_seed_tie_rule', 'TOTAL_POINTS_SCORED'),
+        # Each playoff matchup spans this many scoring weeks; ESPN brackets are fixed (no reseeding) unless told otherwise
+        "playoff_length": max(1, getattr(league.settings, 'playoff_matchup_period_length', 1) or 1),
+        "reseed": False,
+    }
+
+def incidence(state):
+    """Games x teams one-hot matrices for the home and away side of every remaining game."""
+    n_games, n_teams = len(state["home"]), len(state["names"])
+    home, away = np.zeros((n_games, n_teams), dtype=np.float32), np.zeros((n_games, n_teams), dtype=np.float32)
+    home[np.arange(n_games), state["home"]] = 1
+    away[np.arange(n_games), state["away"]] = 1
+    return home, away
+
+# --- ENGINE ---
+# Every team scores N(mean, SCORE_SD) each week. A game is drawn as its home margin D and its combined score S,
+# which are independent normals, so the result only needs one draw per game. S is folded into one draw per team
+# (matching each team's points variance) since it only moves the points tiebreak, never a result.
+def simulate(state, sims, rng):
+    """`margin` is sims x games (home score minus away score), `noise` is sims x teams of standard normals for the points total."""
+    mean_margin = (state["mean"][state["home"]] - state["mean"][state["away"]]).astype(np.float32)
+    margin = rng.standard_normal((sims, len(mean_margin)), dtype=np.float32)
+    margin *= np.float32(SCORE_SD * math.sqrt(2))
+    margin += mean_margin
+    return margin, rng.standard_normal((sims, len(state["names"])), dtype=np.float32)
+
+def standings(state, margin, noise):
+    """Final (wins, points), each sims x teams, with every simulated game resolved head to head."""
+    home, away = incidence(state)
+    n_played = (home + away).sum(axis=0)
+    won = (margin > 0).astype(np.float32)
+    mean_margin = (state["mean"][state["home"]] - state["mean"][state["away"]]).astype(np.float32)
+    wins = state["wins"] + won @ home + (1 - won) @ away
+    points = (state["points"] + n_played * state["mean"] + 0.5 * (margin - mean_margin) @ (home - away)
+              + noise * (SCORE_SD * np.sqrt(n_played / 2)).astype(np.float32))
+    return wins, points
+
+def seeding(wins, points):
+    """
+    Team indices of each simulation in finishing order: most wins first, total points breaking ties.
+    This is ESPN's TOTAL_POINTS_SCORED seeding rule; leagues on another rule (state["seed_tiebreak"]) get the same
+    approximation, and division winners are not seeded ahead.
+    """
+    # Season points stay far below 1e5, so one float key sorts wins first and points second
+    return np.argsort(-(wins * 1e5 + points), axis=-1, kind='stable')
+
+def field(state, margin, noise):
+    """Team indices of each simulation in seed order: ESPN's actual seeds once the bracket is set, else simulated standings."""
+    if state.get("seeds") is not None: return np.broadcast_to(state["seeds"], (len(margin), len(state["seeds"])))
+    return seeding(*standings(state, margin, noise))
+
+def playoff_counts(state, margin, noise, rng=None):
+    """Number of simulations in the given tensor in which each team makes the playoffs."""
+    order = field(state, margin, noise)
+    return np.bincount(order[:, :state["playoff_teams"]].ravel(), minlength=len(state["names"]))
+
+# --- PLAYOFF BRACKET ---
+def bracket_slots(n_teams):
+    """Seed (0-based) in each bracket slot, standard layout: 1v8, 4v5, 2v7, 3v6 ... Seeds >= n_teams are byes."""
+    slots = [0]
+    while len(slots) < n_teams:
+        size = 2 * len(slots)
+        slots = [s for seed in slots for s in (seed, size - 1 - seed)]
+    return np.array(slots)
+
+def round_names(n_rounds):
+    named = {n_rounds: "Final", n_rounds - 1: "Semis", n_rounds - 2: "Quarters"}
+    return ["Playoffs"] + [named.get(r, f"Round {r}") for r in range(2, n_rounds + 1)] + ["Title"]
+
+def bracket_counts(state, margin, noise, rng):
+    """
+    Plays the playoff bracket out in every simulation. Row r of the result counts how often each team reaches round r + 1
+    (row 0 = made the playoffs); the last row counts titles. Top seeds take the byes when the field isn't a power of two.
+    """
+    n, n_teams, length = state["playoff_teams"], len(state["names"]), state["playoff_length"]
+    order = field(state, margin, noise)[:, :n]
+    alive = np.broadcast_to(bracket_slots(n), (len(order), len(bracket_slots(n)))).copy()
+    counts = [np.bincount(order.ravel(), minlength=n_teams)]
+    played = state.get("results") or []
+    while alive.shape[1] > 1:
+        if state["reseed"]:
+            alive = np.sort(alive, axis=1)
+            a, b = alive[:, :alive.shape[1] // 2], alive[:, ::-1][:, :alive.shape[1] // 2]
+        else:
+            a, b = alive[:, 0::2], alive[:, 1::2]
+        team_a = np.take_along_axis(order, np.minimum(a, n - 1), axis=1)
+        team_b = np.take_along_axis(order, np.minimum(b, n - 1), axis=1)
+        draw = rng.standard_normal((2,) + a.shape, dtype=np.float32) * np.float32(SCORE_SD * math.sqrt(length))
+        a_wins = (b >= n) | ((a < n) & (length * state["mean"][team_a] + draw[0] > length * state["mean"][team_b] + draw[1]))
+        r = len(counts) - 1
+        if r < len(played):
+            # Rounds ESPN has already decided keep their real winner instead of the draw
+            res_a, res_b = played[r][team_a], played[r][team_b]
+            a_wins = np.where((b < n) & ((res_a != 0) | (res_b != 0)), (res_a > 0) | (res_b < 0), a_wins)
+        alive = np.where(a_wins, a, b)
+        counts.append(np.bincount(np.take_along_axis(order, alive, axis=1).ravel(), minlength=n_teams))
+    return np.array(counts)
+
+# --- BACKEND ---
+def _run_batch(args):
+    count_fn, state, sims, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+    return count_fn(state, *simulate(state, sims, rng), rng)
+
+def run_batches(count_fn, state, sims, seed=None, workers=None):
+    """
+    Sums count_fn(state, margin, noise, rng) over `sims` simulations drawn in BATCH-sized chunks.
+    Every chunk gets its own SeedSequence-spawned generator, so a fixed seed gives the same counts
+    bit for bit whether the chunks run in this process or across a process pool.
+    """
+    sizes = [min(BATCH, sims - start) for start in range(0, sims, BATCH)]
+    jobs = [(count_fn, state, n, ss) for n, ss in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes)))]
+    workers = min(workers or WORKERS, len(jobs))
+    if workers > 1 and sims >= POOL_MIN_SIMS:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT) as pool: return sum(pool.map(_run_batch, jobs))
+    return sum(map(_run_batch, jobs))
+
+def precision(counts, sims):
+    """Agresti-Coull estimate, standard error and 95% interval; unlike the plain binomial SE it never reads 0 at 0% or 100%."""
+    n = sims + Z95 ** 2
+    p = (counts + Z95 ** 2 / 2) / n
+    se = np.sqrt(p * (1 - p) / n)
+    return se, np.clip(p - Z95 * se, 0, 1), np.clip(p + Z95 * se, 0, 1)
+
+def run_adaptive(count_fn, state, target_se, seed=None, max_sims=MAX_SIMS, workers=None):
+    """
+    Runs ADAPTIVE_BATCH-sized chunks until every count's standard error is at or below `target_se`, or `max_sims` is reached.
+    Returns (counts, sims). Chunks are checked in spawn order and anything past the stopping chunk is discarded,
+    so a fixed seed stops at the same point with the same counts for any worker count.
+    Most runs stop well short of POOL_MIN_SIMS, so chunks run in-process until that many are done and only then fan out to a pool.
+    """
+    seeds = np.random.SeedSequence(seed)
+    workers = max(1, workers or WORKERS)
+    pool, counts, sims = None, 0, 0
+    try:
+        while sims < max_sims:
+            if pool is None and workers > 1 and sims >= POOL_MIN_SIMS: pool = ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT)
+            width = workers if pool else 1
+            sizes = [n for n in (min(ADAPTIVE_BATCH, max_sims - sims - i * ADAPTIVE_BATCH) for i in range(width)) if n > 0]
+            jobs = [(count_fn, state, n, ss) for n, ss in zip(sizes, seeds.spawn(len(sizes)))]
+            for n, chunk in zip(sizes, (pool.map if pool else map)(_run_batch, jobs)):
+                counts, sims = counts + chunk, sims + n
+                if precision(counts, sims)[0].max() <= target_se: return counts, sims
+    finally:
+        if pool: pool.shutdown(cancel_futures=True)
+    return counts, sims
+
+def playoff_odds(state, sims, seed=None, workers=None):
+    """Share of simulated seasons in which each team finishes inside the playoff line."""
+    return run_batches(playoff_counts, state, sims, seed, workers) / sims
+
+# --- SCENARIOS ---
+def forced_games(state, week, winners):
+    """{game index: winning team index} for the games in `week` that one of `winners` (team indices) plays in."""
+    winners = set(winners)
+    return {g: int(t) for g in np.flatnonzero(state["week"] == week) for t in (state["home"][g], state["away"][g]) if t in winners}
+
+def force_results(state, margin, forced, rng):
+    """
+    Copy of `margin` with each forced game won by its forced team in every simulation.
+    Simulations that drew the other result take a margin resampled from those that drew the forced one,
+    which is a draw from the margin conditioned on that result; every other game is left as it was.
+    """
+    margin = margin.copy()
+    for g, team in forced.items():
+        col = margin[:, g]
+        ok = col > 0 if team == state["home"][g] else col < 0
+        if ok.all(): continue
+        # The forced team never won this game in any simulation: flip the margins rather than have nothing to resample
+        col[~ok] = rng.choice(col[ok], int((~ok).sum())) if ok.any() else -col[~ok]
+    return margin
+
+# --- EXACT CLINCH / ELIMINATION ---
+EXACT_MAX_NODES = 20_000
+EXACT_MAX_GAMES = 36  # past this the search reliably runs out of budget, so don't start it
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+def week_blocks(state):
+    """
+    Per remaining week, every outcome of that week's games as a bitmask row (bit j set = home team won game j),
+    expanded to the wins each team gains: a 2^games x teams array. Also returns each team's games per week.
+    """
+    home, away = incidence(state)
+    blocks = []
+    for w in state["weeks"]:
+        g = np.flatnonzero(state["week"] == w)
+        bits = ((np.arange(2 ** len(g))[:, None] >> np.arange(len(g))) & 1).astype(np.float32)
+        gained = bits @ home[g] + (1 - bits) @ away[g]
+        blocks.append((gained.astype(int), (home[g] + away[g]).sum(axis=0).astype(int)))
+    return blocks
+
+def _search(blocks, wins, remaining, prune, accept, budget):
+    """
+    Depth-first search over week blocks for an outcome satisfying `accept`.
+    `prune(wins, remaining)` rejects every option of a week at once (vectorized over rows), so whole subtrees
+    that cannot contain a witness are never expanded.
+    """
+    budget[0] -= 1
+    if budget[0] < 0: raise SearchBudgetExceeded()
+    if accept(wins, remaining): return True
+    if not blocks: return False
+    (gained, played), rest = blocks[0], blocks[1:]
+    options = wins + gained
+    remaining = remaining - played
+    options = options[~prune(options, remaining)]
+    return any(_search(rest, row, remaining, prune, accept, budget) for row in options)
+
+def remaining_games(blocks, n_teams):
+    return sum((played for _, played in blocks), np.zeros(n_teams, dtype=int))
+
+def misses_with(state, blocks, team, extra, budget):
+    """True if `team` can finish with exactly `extra` more wins and still miss the playoffs on the worst tiebreak."""
+    n, target = state["playoff_teams"], state["wins"][team] + extra
+    others = np.arange(len(state["names"])) != team
+    def prune(wins, remaining):
+        wins, remaining = np.atleast_2d(wins), np.atleast_2d(remaining)
+        off_target = (wins[:, team] > target) | (wins[:, team] + remaining[:, team] < target)
+        return off_target | (((wins + remaining)[:, others] >= target).sum(axis=1) < n)
+    def accept(wins, remaining):
+        # Others' wins never go down, so once n of them are level or ahead the rest of the season can't save `team`
+        return wins[team] <= target <= wins[team] + remaining[team] and (wins[others] >= target).sum() >= n
+    rem = remaining_games(blocks, len(state["names"]))
+    return not prune(state["wins"], rem)[0] and _search(blocks, state["wins"].copy(), rem, prune, accept, budget)
+
+def can_make_it(state, blocks, team, budget):
+    """True if `team`, winning out, makes the playoffs in some outcome on the best tiebreak."""
+    n = state["playoff_teams"]
+    others = np.arange(len(state["names"])) != team
+    rem = remaining_games(blocks, len(state["names"]))
+    target = state["wins"][team] + rem[team]
+    def prune(wins, remaining):
+        wins, remaining = np.atleast_2d(wins), np.atleast_2d(remaining)
+        return (wins[:, team] + remaining[:, team] < target) | ((wins[:, others] > target).sum(axis=1) >= n)
+    def accept(wins, remaining):
+        return (wins[others] + remaining[others] > target).sum() < n
+    return not prune(state["wins"], rem)[0] and _search(blocks, state["wins"].copy(), rem, prune, accept, budget)
+
+def clinch_status(state, max_nodes=EXACT_MAX_NODES):
+    """
+    Exact playoff status per team from the remaining schedule alone, or None when the search outgrows `max_nodes`.
+    Each entry is {"clinched", "eliminated", "magic"}: clinched/eliminated hold whatever the points tiebreak does,
+    and magic is the fewest further wins that clinch regardless of other results (None if the team needs help).
+    """
+    if state.get("seeds") is not None:
+        # The field is set: ESPN's seeds are the answer, whatever the points tiebreak would say
+        return [{"clinched": t in state["seeds"], "eliminated": t not in state["seeds"], "magic": 0 if t in state["seeds"] else None}
+                for t in range(len(state["names"]))]
+    if len(state["home"]) > EXACT_MAX_GAMES: return None
+    blocks, budget = week_blocks(state), [max_nodes]
+    rem = remaining_games(blocks, len(state["names"]))
+    status = []
+    try:
+        for t in range(len(state["names"])):
+            # Misses are monotone in wins, so the magic number is the first win total with no way to miss
+            magic = next((k for k in range(rem[t] + 1) if not misses_with(state, blocks, t, k, budget)), None)
+            status.append({"clinched": magic == 0, "eliminated": not can_make_it(state, blocks, t, budget), "magic": magic})
+    except SearchBudgetExceeded:
+        return None
+    return status
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+import pandas as pd
+
+# --- CONFIG ---
+INJURED = ['OUT', 'IR', 'RESERVE', 'SUSPENDED']
+BENCH_STAR_MIN = 15
+TOP_N = 5
+
+@dataclass(frozen=True)
+class WeekSnapshot:
+    """Everything the pages derive from one (league, week): built once per data version, then only read."""
+    week: int
+    matchups: tuple
+    efficiency: pd.DataFrame
+    top_players: pd.DataFrame
+    bench_stars: pd.DataFrame
+
+def build_week_snapshot(games, lineups, names, logos, week):
+    """
+    WeekSnapshot from one week of stored games/lineups. `names`/`logos` map team_id to display values;
+    starters are every non-bench slot, and only healthy starters count toward the Weekly Elite.
+    """
+    games = games[games['week'] == week]
+    lineups = lineups[(lineups['week'] == week) & lineups['team_id'].isin(names)]
+    is_bench = lineups['slot'] == 'BE'
+    team = lineups['team_id'].map(names)
+    rosters = {tid: [{"Name": r.name, "Score": r.points, "Pos": r.slot} for r in df.itertuples()]
+               for tid, df in lineups[~is_bench].groupby('team_id', sort=False)}
+    matchups = tuple({
+        "Home": names.get(g.home_id, "Bye"), "Home Score": g.home_score, "Home Logo": logos.get(g.home_id, ""), "Home Roster": rosters.get(g.home_id, []),
+        "Away": names.get(g.away_id, "Bye"), "Away Score": g.away_score, "Away Logo": logos.get(g.away_id, ""), "Away Roster": rosters.get(g.away_id, [])
+    } for g in games.itertuples())
+
+    pts = lineups['points']
+    eff = pd.DataFrame({"Team": team, "Starters": pts.where(~is_bench, 0), "Bench": pts.where(is_bench, 0)}).groupby(lineups['team_id'], sort=False)
+    eff = eff.agg({"Team": "first", "Starters": "sum", "Bench": "sum"})
+    efficiency = eff.assign(**{"Total Potential": eff['Starters'] + eff['Bench']})[["Team", "Total Potential", "Starters", "Bench"]]
+
+    injured = lineups['injury'].fillna('').str.upper().str.contains('|'.join(INJURED))
+    healthy = lineups[~is_bench & ~injured]
+    top_players = pd.DataFrame({"Name": healthy['name'], "Points": healthy['points'], "Team": team[healthy.index], "ID": healthy['player_id']})
+    stars = lineups[is_bench & (pts > BENCH_STAR_MIN)]
+    bench_stars = pd.DataFrame({"Team": team[stars.index], "Player": stars['name'], "Score": stars['points']})
+    return WeekSnapshot(
+        week=int(week), matchups=matchups,
+        efficiency=efficiency.sort_values(by="Total Potential", ascending=False).reset_index(drop=True),
+        top_players=top_players.sort_values(by="Points", ascending=False).head(TOP_N).reset_index(drop=True),
+        bench_stars=bench_stars.sort_values(by="Score", ascending=False).head(TOP_N).reset_index(drop=True))
@@ -0,0 +1,230 @@
+import glob
+import io
+import json
+import os
+import pickle
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# --- CONFIG ---
+CACHE_DIR = os.getenv("LUX_CACHE_DIR", ".lux_cache")
+DB_PATH = os.path.join(CACHE_DIR, "league.db")
+RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+CACHE_MAX_BYTES = int(os.getenv("LUX_CACHE_MB", "512")) * 2**20
+SPILL_BYTES = 2**20
+
+GAME_COLS = ["week", "game", "home_id", "away_id", "home_score", "away_score", "home_projected", "away_projected", "is_playoff"]
+LINEUP_COLS = ["week", "team_id", "player_id", "name", "position", "slot", "eligible", "points", "projected", "injury", "acquisition", "pro_team"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS weeks (league_id TEXT, year INTEGER, week INTEGER, final INTEGER, PRIMARY KEY (league_id, year, week));
+CREATE TABLE IF NOT EXISTS games (league_id TEXT, year INTEGER, week INTEGER, game INTEGER, home_id INTEGER, away_id INTEGER,
+    home_score REAL, away_score REAL, home_projected REAL, away_projected REAL, is_playoff INTEGER);
+CREATE TABLE IF NOT EXISTS lineups (league_id TEXT, year INTEGER, week INTEGER, team_id INTEGER, player_id INTEGER, name TEXT,
+    position TEXT, slot TEXT, eligible TEXT, points REAL, projected REAL, injury TEXT, acquisition TEXT, pro_team TEXT);
+CREATE TABLE IF NOT EXISTS player_ids (year INTEGER, source TEXT, key TEXT, value TEXT, method TEXT, PRIMARY KEY (year, source, key));
+CREATE TABLE IF NOT EXISTS odds (key TEXT PRIMARY KEY, fetched_at REAL, kickoff REAL, payload TEXT);
+CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, fn TEXT, created_at REAL, accessed_at REAL, size INTEGER, payload BLOB);
+CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner INTEGER, expires REAL);
+CREATE TABLE IF NOT EXISTS award_state (league_id TEXT, year INTEGER, week INTEGER, payload TEXT, PRIMARY KEY (league_id, year, week));
+CREATE INDEX IF NOT EXISTS ix_games ON games (league_id, year, week);
+CREATE INDEX IF NOT EXISTS ix_lineups ON lineups (league_id, year, week);
+"""
+
+def connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _team_id(team):
+    # ESPN leaves a bare 0 in place of the Team object on bye matchups
+    return getattr(team, 'team_id', team) or 0
+
+def flatten_box_scores(box, week):
+    """Flattens one week of espn_api BoxScore objects into (games, lineups) rows."""
+    games, lineups = [], []
+    for i, g in enumerate(box):
+        h_id, a_id = _team_id(g.home_team), _team_id(g.away_team)
+        games.append((week, i, h_id, a_id, g.home_score, g.away_score, g.home_projected, g.away_projected, int(getattr(g, 'is_playoff', False))))
+        for tid, lineup in [(h_id, g.home_lineup), (a_id, g.away_lineup)]:
+            for p in lineup:
+                lineups.append((
+                    week, tid, p.playerId, p.name, p.position, p.slot_position, "|".join(getattr(p, 'eligibleSlots', []) or []),
+                    p.points, getattr(p, 'projected_points', 0), str(getattr(p, 'injuryStatus', 'ACTIVE')),
+                    str(getattr(p, 'acquisitionType', 'DRAFT')), getattr(p, 'proTeam', 'UNK')
+                ))
+    return games, lineups
+
+def finalized_weeks(league_id, year):
+    with connect() as conn:
+        rows = conn.execute("SELECT week FROM weeks WHERE league_id=? AND year=? AND final=1", (str(league_id), int(year))).fetchall()
+    return {r[0] for r in rows}
+
+def save_week(league_id, year, week, box, final):
+    key = (str(league_id), int(year), int(week))
+    games, lineups = flatten_box_scores(box, week)
+    with connect() as conn:
+        conn.execute("DELETE FROM games WHERE league_id=? AND year=? AND week=?", key)
+        conn.execute("DELETE FROM lineups WHERE league_id=? AND year=? AND week=?", key)
+        conn.executemany(f"INSERT INTO games VALUES (?,?,{','.join('?' * len(GAME_COLS))})", [key[:2] + g for g in games])
+        conn.executemany(f"INSERT INTO lineups VALUES (?,?,{','.join('?' * len(LINEUP_COLS))})", [key[:2] + r for r in lineups])
+        conn.execute("INSERT OR REPLACE INTO weeks VALUES (?,?,?,?)", key + (int(final),))
+
+def read_season(league_id, year, through_week, first_week=1):
+    params = (str(league_id), int(year), int(first_week), int(through_week))
+    with connect() as conn:
+        games = pd.read_sql_query(f"SELECT {','.join(GAME_COLS)} FROM games WHERE league_id=? AND year=? AND week BETWEEN ? AND ? ORDER BY week, game", conn, params=params)
+        lineups = pd.read_sql_query(f"SELECT {','.join(LINEUP_COLS)} FROM lineups WHERE league_id=? AND year=? AND week BETWEEN ? AND ? ORDER BY week, rowid", conn, params=params)
+    return games, lineups
+
+def fetch_serial(league, weeks):
+    return {w: league.box_scores(week=w) for w in weeks}
+
+def load_season(league, through_week, fetch=fetch_serial, first_week=1):
+    """
+    Returns (games, lineups) frames for weeks first_week..through_week.
+    Weeks that have finalized are served from disk; only new or in-progress weeks hit ESPN.
+    """
+    done = finalized_weeks(league.league_id, league.year)
+    missing = [w for w in range(first_week, through_week + 1) if w not in done]
+    if missing:
+        for w, box in fetch(league, missing).items():
+            save_week(league.league_id, league.year, w, box, final=w < league.current_week)
+    return read_season(league.league_id, league.year, through_week, first_week)
+
+def load_week(league, week, fetch=fetch_serial):
+    """(games, lineups) for a single week: served from disk once final, otherwise refetched from ESPN on every call."""
+    if week not in finalized_weeks(league.league_id, league.year):
+        for w, box in fetch(league, [week]).items():
+            save_week(league.league_id, league.year, w, box, final=w < league.current_week)
+    return read_season(league.league_id, league.year, week, first_week=week)
+
+# --- PLAYER IDENTITY ---
+def load_player_ids(year, source, with_method=False):
+    """{key: value}, or {key: (value, method)} with `with_method`."""
+    with connect() as conn:
+        rows = conn.execute("SELECT key, value, method FROM player_ids WHERE year=? AND source=?", (int(year), source)).fetchall()
+    return {k: (v, m) if with_method else v for k, v, m in rows}
+
+def save_player_ids(year, source, rows):
+    """rows: iterable of (key, value, method)."""
+    with connect() as conn:
+        conn.executemany("INSERT OR REPLACE INTO player_ids VALUES (?,?,?,?,?)", [(int(year), source, str(k), str(v), m) for k, v, m in rows])
+
+# --- ODDS ---
+def load_odds(key):
+    """(payload, fetched_at, kickoff) for a cached Odds API response, or None."""
+    with connect() as conn:
+        row = conn.execute("SELECT payload, fetched_at, kickoff FROM odds WHERE key=?", (key,)).fetchone()
+    return (json.loads(row[0]), row[1], row[2]) if row else None
+
+def save_odds(key, kickoff, payload, fetched_at):
+    with connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO odds VALUES (?,?,?,?)", (key, fetched_at, kickoff, json.dumps(payload)))
+
+# --- AWARDS ---
+def load_award_state(league_id, year, through_week):
+    """Latest saved running awards state at or before through_week, or None."""
+    with connect() as conn:
+        row = conn.execute("SELECT payload FROM award_state WHERE league_id=? AND year=? AND week<=? ORDER BY week DESC LIMIT 1",
+                           (str(league_id), int(year), int(through_week))).fetchone()
+    return json.loads(row[0]) if row else None
+
+def save_award_state(league_id, year, week, state):
+    with connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO award_state VALUES (?,?,?,?)", (str(league_id), int(year), int(week), json.dumps(state)))
+
+# --- RESULT CACHE ---
+# Shared by every app process on the host: WAL lets readers run alongside a writer, and large frames/arrays are spilled
+# to Arrow/.npy files next to the database so other workers memory-map them instead of unpickling a private copy.
+def read_arrow(path):
+    # split_blocks lets numeric columns stay zero-copy views over the mapped file
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+def write_arrow(df, path):
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=True), f"{path}.tmp", compression="uncompressed")
+    os.replace(f"{path}.tmp", path)
+
+def write_npy(arr, path):
+    with open(f"{path}.tmp", "wb") as f: np.save(f, arr, allow_pickle=False)
+    os.replace(f"{path}.tmp", path)
+
+class _Spiller(pickle.Pickler):
+    def __init__(self, file, prefix):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.prefix, self.spilled, self.size = prefix, 0, 0
+    def persistent_id(self, obj):
+        if isinstance(obj, pd.DataFrame) and obj.memory_usage(index=False).sum() >= SPILL_BYTES: kind, write = "arrow", write_arrow
+        elif isinstance(obj, np.ndarray) and obj.dtype != object and obj.nbytes >= SPILL_BYTES: kind, write = "npy", write_npy
+        else: return None
+        name = f"{self.prefix}{self.spilled}.{kind}"
+        try: write(obj, os.path.join(RESULTS_DIR, name))
+        except: return None
+        self.spilled += 1
+        self.size += os.path.getsize(os.path.join(RESULTS_DIR, name))
+        return kind, name
+
+class _Mapper(pickle.Unpickler):
+    def persistent_load(self, pid):
+        kind, name = pid
+        path = os.path.join(RESULTS_DIR, name)
+        return read_arrow(path) if kind == "arrow" else np.load(path, mmap_mode="r")
+
+def _spill_prefix(key, created_at):
+    # Every write gets its own file names, so a recompute never changes the arrays behind a payload another worker holds
+    return f"{key}.{int(created_at * 1e6)}."
+
+def dumps(value, key, created_at):
+    """(payload, bytes on disk) for a result; DataFrames and arrays over SPILL_BYTES go to shared files instead of the payload."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    buf = io.BytesIO()
+    spiller = _Spiller(buf, _spill_prefix(key, created_at))
+    spiller.dump(value)
+    return buf.getvalue(), len(buf.getvalue()) + spiller.size
+
+def loads(payload):
+    return _Mapper(io.BytesIO(payload)).load()
+
+def load_cached(key, ttl=None):
+    """(payload, created_at) for a cached result younger than ttl seconds, or None. A hit refreshes its LRU position."""
+    now = time.time()
+    with connect() as conn:
+        row = conn.execute("SELECT payload, created_at FROM results WHERE key=?", (key,)).fetchone()
+        if row is None or (ttl and now - row[1] > ttl): return None
+        conn.execute("UPDATE results SET accessed_at=? WHERE key=?", (now, key))
+    return row
+
+def save_cached(key, fn, payload, size, created_at, max_bytes=CACHE_MAX_BYTES):
+    """
+    Stores a result written by dumps(..., created_at), drops the spill files of any earlier write of the key, then evicts
+    least recently used rows and their spill files until the cache fits in max_bytes.
+    """
+    with connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO results VALUES (?,?,?,?,?,?)", (key, fn, created_at, created_at, size, payload))
+        evicted = [r[0] for r in conn.execute(
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS used FROM results) WHERE used > ?", (max_bytes,))]
+        conn.executemany("DELETE FROM results WHERE key=?", [(k,) for k in evicted])
+    current = os.path.join(RESULTS_DIR, _spill_prefix(key, created_at))
+    stale = [p for p in glob.glob(os.path.join(RESULTS_DIR, f"{key}.*")) if not p.startswith(current) and not p.endswith(".tmp")]
+    # Workers that already mapped a removed file keep their view; unlink only drops the name, and an unmapped stale
+    # payload fails to load and is treated as a miss
+    for path in stale + [p for k in evicted for p in glob.glob(os.path.join(RESULTS_DIR, f"{k}.*"))]:
+        try: os.remove(path)
+        except: pass
+
+def acquire_lease(key, seconds):
+    """True if this process now owns the right to compute `key`; a lease left by a crashed worker lapses after `seconds`."""
+    now = time.time()
+    with connect() as conn:
+        conn.execute("DELETE FROM leases WHERE key=? AND expires<?", (key, now))
+        return conn.execute("INSERT OR IGNORE INTO leases VALUES (?,?,?)", (key, os.getpid(), now + seconds)).rowcount == 1
+
+def release_lease(key):
+    with connect() as conn: conn.execute("DELETE FROM leases WHERE key=? AND owner=?", (key, os.getpid()))